@@ -1,82 +1,220 @@
+import hashlib
+import io
+import logging
 import os
+import pickle
 import textwrap
+import time
 import unicodedata
 import re
-from typing import List
+from typing import List, Dict, Any, Tuple
 
+import numpy as np
+import faiss
 import ollama
 
+from rag_core import EMBED_MODEL, embed_texts
+
 LLM_MODEL_DEFAULT = "gemma3:4b"
 
-# ======= Cores para logs (ANSI) =======
-COLOR_RESET = "\033[0m"
-COLOR_BLUE = "\033[94m"
-COLOR_GREEN = "\033[92m"
-COLOR_YELLOW = "\033[93m"
-COLOR_MAGENTA = "\033[95m"
+log = logging.getLogger(__name__)
 
 OUTPUT_DIR = "output"
 
+# ======= Cache semântico das respostas dos agentes =======
+AGENT_CACHE_DIR = os.path.join(OUTPUT_DIR, ".agent_cache")
+AGENT_CACHE_SIM_THRESHOLD = 0.95  # similaridade de cosseno mínima para reaproveitar uma resposta
+AGENT_CACHE_TTL_SECONDS = 300
+AGENT_CACHE_MAX_ENTRIES = 256
+
 
 # ---------- Utilitário para criar nomes de arquivos ----------
+_SANITIZE_RE = re.compile(r"[^a-z0-9_\- ]")
+_SPACE_TRANS = str.maketrans({" ": "_"})
+
+
 def sanitize_filename(name: str) -> str:
-    # Remove acentos
+    # Remove acentos: após o NFKD, o encode ASCII descarta as marcas combinantes numa só passada
     nfkd = unicodedata.normalize("NFKD", name)
-    name = "".join([c for c in nfkd if not unicodedata.combining(c)])
-    # Remove caracteres estranhos
-    name = re.sub(r"[^a-zA-Z0-9_\- ]", "", name)
-    # Substitui espaços por _
-    name = name.replace(" ", "_")
-    return name.lower()
+    name = nfkd.encode("ascii", "ignore").decode("ascii")
+    # Remove caracteres estranhos e substitui espaços por _
+    return _SANITIZE_RE.sub("", name.lower()).translate(_SPACE_TRANS)
 
 
 def ensure_output_dir() -> None:
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 
-# =========================
-# AGENTE 1 – PREPARA AULA
-# =========================
-
-def agente_prepara_aula(
-    tema: str,
-    contextos: List[str],
-    llm_model: str = LLM_MODEL_DEFAULT,
-    nomes_docs: List[str] | None = None,
-) -> str:
+def _markdown_path(prefixo: str, tema: str) -> str:
+    ensure_output_dir()
+    return os.path.join(OUTPUT_DIR, f"{prefixo}_{sanitize_filename(tema)}.md")
 
-    print(f"\n{COLOR_BLUE}[agente_prepara_aula] Iniciando preparação da aula...{COLOR_RESET}")
-    print(f"{COLOR_BLUE}[agente_prepara_aula] Tema recebido: {tema!r}{COLOR_RESET}")
-    print(f"{COLOR_BLUE}[agente_prepara_aula] Quantidade de contextos recebidos: {len(contextos)}{COLOR_RESET}")
-    print(f"{COLOR_BLUE}[agente_prepara_aula] Modelo LLM usado: {llm_model!r}{COLOR_RESET}")
 
-    if nomes_docs is None:
-        nomes_docs = ["Documento_desconhecido.pdf"] * len(contextos)
+def _salvar_markdown(prefixo: str, tema: str, conteudo: str) -> str:
+    filename = _markdown_path(prefixo, tema)
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(conteudo)
+    return filename
 
-    # lista única de arquivos para o prompt
-    arquivos_unicos = sorted(set(n for n in nomes_docs if n is not None))
 
-    # Mostrar prévia dos contextos
-    for i, (ctx, doc_name) in enumerate(zip(contextos, nomes_docs), start=1):
-        preview = ctx[:200].replace("\n", " ")
-        print(
-            f"{COLOR_YELLOW}[agente_prepara_aula] Prévia do contexto {i} "
-            f"({doc_name}): {preview!r}...{COLOR_RESET}"
-        )
-
-    # Cada contexto recebe um cabeçalho com a fonte
-    # formato: [FONTE: nome_do_arquivo.pdf]
-    contextos_marcados = []
-    for ctx, doc_name in zip(contextos, nomes_docs):
-        bloco = f"[FONTE: {doc_name}]\n{ctx}"
-        contextos_marcados.append(bloco)
+def _chat_em_stream_para_arquivo(
+    filename: str,
+    llm_model: str,
+    messages: List[Dict[str, str]],
+) -> str:
+    """
+    Chama o Ollama com stream=True e grava cada pedaço da resposta no arquivo
+    assim que chega, de modo que o Markdown já pode ser lido durante a geração.
+    Retorna a resposta completa.
+    """
+    partes: List[str] = []
+    with open(filename, "w", encoding="utf-8") as f:
+        for part in ollama.chat(model=llm_model, messages=messages, stream=True):
+            token = part["message"]["content"]
+            f.write(token)
+            f.flush()
+            partes.append(token)
+    return "".join(partes)
+
+
+# ---------- Cache semântico (tema + arquivos -> resposta já gerada) ----------
+# Cada agente, e cada par LLM + modelo de embedding, tem seu próprio namespace em
+# output/.agent_cache/<agente>__<modelo>_<hash>/ com:
+# - cache.index: IndexFlatIP sobre embeddings normalizados (produto interno = cosseno)
+# - cache_entries.pkl: lista de dicts alinhada com as linhas do índice
+
+def _cache_namespace(agente: str, llm_model: str) -> str:
+    # Um namespace por agente e por modelo: a resposta de um modelo nunca é devolvida
+    # quando o agente é chamado com outro. O modelo de embedding entra no hash porque
+    # trocar o EMBED_BACKEND muda a dimensão dos vetores do índice do cache. O hash curto
+    # também evita colisões do sanitize_filename (ex.: "gemma3:4b" e "gemma34b")
+    digest = hashlib.sha1(f"{llm_model}|{EMBED_MODEL}".encode("utf-8")).hexdigest()[:8]
+    return f"{agente}__{sanitize_filename(llm_model)}_{digest}"
+
+
+def _agent_cache_paths(namespace: str) -> Tuple[str, str]:
+    base = os.path.join(AGENT_CACHE_DIR, namespace)
+    return os.path.join(base, "cache.index"), os.path.join(base, "cache_entries.pkl")
+
+
+def _load_agent_cache(namespace: str) -> List[Dict[str, Any]]:
+    _, entries_path = _agent_cache_paths(namespace)
+    if not os.path.exists(entries_path):
+        return []
+    try:
+        with open(entries_path, "rb") as f:
+            return pickle.load(f)
+    except Exception as e:
+        log.warning("[cache:%s] Cache ilegível, ignorando. Detalhe: %s", namespace, e)
+        return []
+
+
+def _save_agent_cache(namespace: str, entries: List[Dict[str, Any]]) -> None:
+    index_path, entries_path = _agent_cache_paths(namespace)
+    os.makedirs(os.path.dirname(entries_path), exist_ok=True)
+
+    # O índice é pequeno (no máximo AGENT_CACHE_MAX_ENTRIES linhas): é reconstruído a cada gravação,
+    # o que mantém linhas e entradas alinhadas mesmo após expirações e evicções
+    if entries:
+        index = faiss.IndexFlatIP(entries[0]["emb"].shape[0])
+        index.add(np.stack([e["emb"] for e in entries]))
+        faiss.write_index(index, index_path)
+    elif os.path.exists(index_path):
+        os.remove(index_path)
+
+    with open(entries_path, "wb") as f:
+        pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _read_agent_cache_index(
+    namespace: str,
+    entries: List[Dict[str, Any]],
+    dim: int,
+) -> faiss.Index | None:
+    index_path, _ = _agent_cache_paths(namespace)
+    if not entries or not os.path.exists(index_path):
+        return None
+    index = faiss.read_index(index_path)
+    # Índice desalinhado com as entradas, ou montado com outra dimensão de embedding
+    if index.ntotal != len(entries) or index.d != dim:
+        return None
+    return index
+
+
+def _embed_cache_key(key_text: str) -> np.ndarray:
+    # embed_texts já devolve o vetor normalizado (produto interno = cosseno)
+    return embed_texts([key_text])
+
+
+def buscar_resposta_em_cache(namespace: str, key_text: str) -> Tuple[str | None, np.ndarray | None]:
+    """
+    Procura uma resposta já gerada para uma chave semanticamente equivalente.
+    Retorna (resposta ou None, embedding normalizado da chave ou None se não deu para calcular).
+    """
+    try:
+        emb = _embed_cache_key(key_text)
+    except Exception as e:
+        log.warning("[cache:%s] Não foi possível gerar embedding da chave. Detalhe: %s", namespace, e)
+        return None, None
+
+    entries = _load_agent_cache(namespace)
+    index = _read_agent_cache_index(namespace, entries, emb.shape[1])
+    if index is None:
+        return None, emb
+
+    sims, idxs = index.search(emb, 1)
+    sim, idx = float(sims[0][0]), int(idxs[0][0])
+    if idx < 0 or sim < AGENT_CACHE_SIM_THRESHOLD:
+        return None, emb
+
+    entry = entries[idx]
+    now = time.time()
+    if now - entry["ts"] > AGENT_CACHE_TTL_SECONDS:
+        return None, emb
+
+    log.info("[cache:%s] Resposta reaproveitada do cache (similaridade=%.3f).", namespace, sim)
+    entry["last_used"] = now
+    _save_agent_cache(namespace, entries)
+    return entry["response"], emb
+
+
+def guardar_resposta_em_cache(
+    namespace: str,
+    key_text: str,
+    emb: np.ndarray | None,
+    response: str,
+    files: List[str],
+) -> None:
+    if emb is None:
+        return
+
+    now = time.time()
+    # Descarta o que já expirou (ou tem embedding de outra dimensão) e, se ainda passar do
+    # limite, os menos usados recentemente (LRU)
+    entries = [
+        e for e in _load_agent_cache(namespace)
+        if now - e["ts"] <= AGENT_CACHE_TTL_SECONDS and e["emb"].shape == emb[0].shape
+    ]
+    entries.append({
+        "key_text": key_text,
+        "response": response,
+        "files": files,
+        "ts": now,
+        "last_used": now,
+        "emb": emb[0],
+    })
+    if len(entries) > AGENT_CACHE_MAX_ENTRIES:
+        entries.sort(key=lambda e: e["last_used"])
+        entries = entries[-AGENT_CACHE_MAX_ENTRIES:]
+
+    _save_agent_cache(namespace, entries)
 
-    context = "\n\n---\n\n".join(contextos_marcados)
 
-    # Monta lista de arquivos para o prompt
-    arquivos_str = "\n".join(f"- {nome}" for nome in arquivos_unicos)
+# =========================
+# AGENTE 1 – PREPARA AULA
+# =========================
 
-    user_prompt = f"""
+_PROMPT_HEADER_AULA = textwrap.dedent("""
 Você é um professor universitário de Inteligência Artificial.
 
 Use EXCLUSIVAMENTE o contexto abaixo (trechos extraídos dos PDFs do professor)
@@ -86,7 +224,9 @@ Cada bloco de contexto começa com uma linha no formato:
 [FONTE: NOME_DO_ARQUIVO.pdf]
 
 ARQUIVOS DISPONÍVEIS (USE APENAS ESSES NOMES, COPIANDO-OS EXATAMENTE):
-{arquivos_str if arquivos_str else "- (nenhum nome de arquivo disponível)"}
+""").lstrip()
+
+_PROMPT_RULES_AULA = textwrap.dedent("""
 
 REGRAS SOBRE NOMES DE ARQUIVOS:
 - Você SÓ pode citar arquivos usando exatamente um dos nomes listados acima.
@@ -102,7 +242,9 @@ REGRAS GERAIS IMPORTANTES:
 - Mantenha-se fiel ao conteúdo dos arquivos. Não crie conteúdo que contradiga os textos.
 
 CONTEXTOS:
-{context}
+""")
+
+_PROMPT_TAIL_AULA = textwrap.dedent("""
 
 TAREFA:
 Crie um plano de aula com:
@@ -133,71 +275,97 @@ Tema da aula:
 \"\"\"{tema}\"\"\"
 
 Escreva em português, com seções bem definidas em Markdown (## Títulos, ### subtítulos).
-"""
+""").rstrip()
 
-    print(f"{COLOR_MAGENTA}[agente_prepara_aula] Chamando o modelo Ollama...{COLOR_RESET}")
-    response = ollama.chat(
-        model=llm_model,
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "Você é um especialista em didática universitária de Inteligência Artificial. "
-                    "Você NUNCA inventa informações que não estejam nos contextos fornecidos, "
-                    "NUNCA inventa nomes de arquivos e SEMPRE indica claramente o nome do arquivo PDF "
-                    "de origem, copiando-o exatamente da lista fornecida. "
-                    "Sua resposta deve ser apenas o plano de aula final, sem comentários adicionais."
-                ),
-            },
-            {"role": "user", "content": textwrap.dedent(user_prompt).strip()},
-        ],
-    )
-    conteudo_resposta = response["message"]["content"]
-
-    print(f"{COLOR_GREEN}[agente_prepara_aula] Plano de aula gerado. Salvando arquivo MD...{COLOR_RESET}")
-
-    ensure_output_dir()
-    filename = os.path.join(OUTPUT_DIR, f"plano_de_aula_{sanitize_filename(tema)}.md")
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(conteudo_resposta)
-
-    print(f"{COLOR_GREEN}[agente_prepara_aula] Arquivo salvo: {filename}{COLOR_RESET}")
+_SYS_PROMPT_AULA = (
+    "Você é um especialista em didática universitária de Inteligência Artificial. "
+    "Você NUNCA inventa informações que não estejam nos contextos fornecidos, "
+    "NUNCA inventa nomes de arquivos e SEMPRE indica claramente o nome do arquivo PDF "
+    "de origem, copiando-o exatamente da lista fornecida. "
+    "Sua resposta deve ser apenas o plano de aula final, sem comentários adicionais."
+)
 
-    return conteudo_resposta
-
-
-# =========================
-# AGENTE 2 – TAREFAS DE CASA
-# =========================
 
-def agente_tarefas_casa(
+def agente_prepara_aula(
     tema: str,
     contextos: List[str],
     llm_model: str = LLM_MODEL_DEFAULT,
     nomes_docs: List[str] | None = None,
 ) -> str:
 
-    print(f"\n{COLOR_BLUE}[agente_tarefas_casa] Iniciando criação das tarefas de casa...{COLOR_RESET}")
-    print(f"{COLOR_BLUE}[agente_tarefas_casa] Tema recebido: {tema!r}{COLOR_RESET}")
-    print(f"{COLOR_BLUE}[agente_tarefas_casa] Quantidade de contextos recebidos: {len(contextos)}{COLOR_RESET}")
-    print(f"{COLOR_BLUE}[agente_tarefas_casa] Modelo LLM usado: {llm_model!r}{COLOR_RESET}")
+    log.info("[agente_prepara_aula] Iniciando preparação da aula...")
+    log.info("[agente_prepara_aula] Tema recebido: %r", tema)
+    log.info("[agente_prepara_aula] Quantidade de contextos recebidos: %d", len(contextos))
+    log.info("[agente_prepara_aula] Modelo LLM usado: %r", llm_model)
 
     if nomes_docs is None:
         nomes_docs = ["Documento_desconhecido.pdf"] * len(contextos)
 
+    # lista única de arquivos para o prompt
     arquivos_unicos = sorted(set(n for n in nomes_docs if n is not None))
 
-    # Numerar contextos com documento na primeira linha
-    contextos_marcados = []
-    for ctx, doc_name in zip(contextos, nomes_docs):
-        bloco = f"[FONTE: {doc_name}]\n{ctx}"
-        contextos_marcados.append(bloco)
+    cache_ns = _cache_namespace("agente_prepara_aula", llm_model)
+    key_text = tema + "||" + "|".join(arquivos_unicos)
+    resposta_cache, key_emb = buscar_resposta_em_cache(cache_ns, key_text)
+    if resposta_cache is not None:
+        filename = _salvar_markdown("plano_de_aula", tema, resposta_cache)
+        log.info("[agente_prepara_aula] Arquivo salvo: %s", filename)
+        return resposta_cache
 
-    context = "\n\n---\n\n".join(contextos_marcados)
+    # Mostrar prévia dos contextos
+    if log.isEnabledFor(logging.INFO):
+        for i, (ctx, doc_name) in enumerate(zip(contextos, nomes_docs), start=1):
+            preview = ctx[:200].replace("\n", " ")
+            log.info("[agente_prepara_aula] Prévia do contexto %d (%s): %r...", i, doc_name, preview)
 
+    # Monta lista de arquivos para o prompt
     arquivos_str = "\n".join(f"- {nome}" for nome in arquivos_unicos)
 
-    user_prompt = f"""
+    buf = io.StringIO()
+    buf.write(_PROMPT_HEADER_AULA)
+    buf.write(arquivos_str or "- (nenhum nome de arquivo disponível)")
+    buf.write(_PROMPT_RULES_AULA)
+    # Cada contexto recebe um cabeçalho com a fonte, escrito direto no buffer do prompt
+    # formato: [FONTE: nome_do_arquivo.pdf]
+    for i, (ctx, doc_name) in enumerate(zip(contextos, nomes_docs)):
+        if i:
+            buf.write("\n\n---\n\n")
+        buf.write("[FONTE: ")
+        buf.write(str(doc_name))
+        buf.write("]\n")
+        buf.write(ctx)
+    buf.write(_PROMPT_TAIL_AULA.format(tema=tema))
+    user_prompt = buf.getvalue()
+
+    filename = _markdown_path("plano_de_aula", tema)
+
+    log.info("[agente_prepara_aula] Chamando o modelo Ollama (stream para %s)...", filename)
+    conteudo_resposta = _chat_em_stream_para_arquivo(
+        filename,
+        llm_model,
+        [
+            {
+                "role": "system",
+                "content": _SYS_PROMPT_AULA,
+            },
+            {"role": "user", "content": user_prompt},
+        ],
+    )
+
+    log.info("[agente_prepara_aula] Plano de aula gerado.")
+
+    guardar_resposta_em_cache(cache_ns, key_text, key_emb, conteudo_resposta, arquivos_unicos)
+
+    log.info("[agente_prepara_aula] Arquivo salvo: %s", filename)
+
+    return conteudo_resposta
+
+
+# =========================
+# AGENTE 2 – TAREFAS DE CASA
+# =========================
+
+_PROMPT_HEADER_TAREFAS = textwrap.dedent("""
 Você é um professor universitário de Inteligência Artificial.
 
 Use EXCLUSIVAMENTE os contextos abaixo para criar tarefas de casa.
@@ -205,7 +373,9 @@ Cada bloco começa com uma linha no formato:
 [FONTE: NOME_DO_ARQUIVO.pdf]
 
 ARQUIVOS DISPONÍVEIS (USE APENAS ESSES NOMES, COPIANDO-OS EXATAMENTE):
-{arquivos_str if arquivos_str else "- (nenhum nome de arquivo disponível)"}
+""").lstrip()
+
+_PROMPT_RULES_TAREFAS = textwrap.dedent("""
 
 REGRAS SOBRE NOMES DE ARQUIVOS:
 - Você SÓ pode citar arquivos usando exatamente um dos nomes listados acima.
@@ -222,7 +392,9 @@ REGRAS GERAIS IMPORTANTES:
 - Mantenha-se fiel aos conteúdos dos arquivos.
 
 CONTEXTOS:
-{context}
+""")
+
+_PROMPT_TAIL_TAREFAS = textwrap.dedent("""
 
 TAREFA:
 Crie um conjunto de tarefas de casa (homework) alinhadas ao tema, contendo:
@@ -252,33 +424,78 @@ Tema:
 \"\"\"{tema}\"\"\"
 
 Escreva em português, bem estruturado em Markdown.
-"""
+""").rstrip()
+
+_SYS_PROMPT_TAREFAS = (
+    "Você cria tarefas universitárias de Inteligência Artificial "
+    "baseadas APENAS nos contextos fornecidos, sem inventar fatos, "
+    "NUNCA inventa nomes de arquivos e SEMPRE usa exatamente os nomes da lista de arquivos. "
+    "Sua resposta deve ser apenas o conjunto de tarefas final, sem comentários adicionais."
+)
+
+
+def agente_tarefas_casa(
+    tema: str,
+    contextos: List[str],
+    llm_model: str = LLM_MODEL_DEFAULT,
+    nomes_docs: List[str] | None = None,
+) -> str:
+
+    log.info("[agente_tarefas_casa] Iniciando criação das tarefas de casa...")
+    log.info("[agente_tarefas_casa] Tema recebido: %r", tema)
+    log.info("[agente_tarefas_casa] Quantidade de contextos recebidos: %d", len(contextos))
+    log.info("[agente_tarefas_casa] Modelo LLM usado: %r", llm_model)
 
-    print(f"{COLOR_MAGENTA}[agente_tarefas_casa] Chamando o modelo Ollama...{COLOR_RESET}")
-    response = ollama.chat(
-        model=llm_model,
-        messages=[
+    if nomes_docs is None:
+        nomes_docs = ["Documento_desconhecido.pdf"] * len(contextos)
+
+    arquivos_unicos = sorted(set(n for n in nomes_docs if n is not None))
+
+    cache_ns = _cache_namespace("agente_tarefas_casa", llm_model)
+    key_text = tema + "||" + "|".join(arquivos_unicos)
+    resposta_cache, key_emb = buscar_resposta_em_cache(cache_ns, key_text)
+    if resposta_cache is not None:
+        filename = _salvar_markdown("tarefas_de_casa", tema, resposta_cache)
+        log.info("[agente_tarefas_casa] Arquivo salvo: %s", filename)
+        return resposta_cache
+
+    arquivos_str = "\n".join(f"- {nome}" for nome in arquivos_unicos)
+
+    buf = io.StringIO()
+    buf.write(_PROMPT_HEADER_TAREFAS)
+    buf.write(arquivos_str or "- (nenhum nome de arquivo disponível)")
+    buf.write(_PROMPT_RULES_TAREFAS)
+    # Cada contexto recebe um cabeçalho com a fonte, escrito direto no buffer do prompt
+    # formato: [FONTE: nome_do_arquivo.pdf]
+    for i, (ctx, doc_name) in enumerate(zip(contextos, nomes_docs)):
+        if i:
+            buf.write("\n\n---\n\n")
+        buf.write("[FONTE: ")
+        buf.write(str(doc_name))
+        buf.write("]\n")
+        buf.write(ctx)
+    buf.write(_PROMPT_TAIL_TAREFAS.format(tema=tema))
+    user_prompt = buf.getvalue()
+
+    filename = _markdown_path("tarefas_de_casa", tema)
+
+    log.info("[agente_tarefas_casa] Chamando o modelo Ollama (stream para %s)...", filename)
+    conteudo_resposta = _chat_em_stream_para_arquivo(
+        filename,
+        llm_model,
+        [
             {
                 "role": "system",
-                "content": (
-                    "Você cria tarefas universitárias de Inteligência Artificial "
-                    "baseadas APENAS nos contextos fornecidos, sem inventar fatos, "
-                    "NUNCA inventa nomes de arquivos e SEMPRE usa exatamente os nomes da lista de arquivos. "
-                    "Sua resposta deve ser apenas o conjunto de tarefas final, sem comentários adicionais."
-                ),
+                "content": _SYS_PROMPT_TAREFAS,
             },
-            {"role": "user", "content": textwrap.dedent(user_prompt).strip()},
+            {"role": "user", "content": user_prompt},
         ],
     )
-    conteudo_resposta = response["message"]["content"]
 
-    print(f"{COLOR_GREEN}[agente_tarefas_casa] Conteúdo gerado. Salvando arquivo MD...{COLOR_RESET}")
+    log.info("[agente_tarefas_casa] Conteúdo gerado.")
 
-    ensure_output_dir()
-    filename = os.path.join(OUTPUT_DIR, f"tarefas_de_casa_{sanitize_filename(tema)}.md")
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(conteudo_resposta)
+    guardar_resposta_em_cache(cache_ns, key_text, key_emb, conteudo_resposta, arquivos_unicos)
 
-    print(f"{COLOR_GREEN}[agente_tarefas_casa] Arquivo salvo: {filename}{COLOR_RESET}")
+    log.info("[agente_tarefas_casa] Arquivo salvo: %s", filename)
 
     return conteudo_resposta
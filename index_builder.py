@@ -1,65 +1,131 @@
+import asyncio
+import math
 import os
-import pickle
+import re
 import json  # para salvar metadados legíveis
-from typing import List, Tuple, Dict, Any
+import logging
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Dict, Any, Optional
 
 import numpy as np
 import faiss
+import orjson
+import pyarrow as pa
+import pyarrow.ipc as ipc
 from pypdf import PdfReader
 
-from rag_core import EMBED_MODEL
+try:
+    import aiofile  # opcional: escritas concorrentes (io_uring/AIO) no Linux
+except ImportError:
+    aiofile = None
+
+from logging_utils import setup_logging
+from rag_core import (
+    EMBED_BACKEND,
+    EMBED_MODEL,
+    embed_texts,
+    embedding_cache_key,
+    embedding_cache_path,
+    load_cached_embedding,
+    save_cached_embedding,
+)
 import ollama
 
-# ======= Cores para logs (ANSI) =======
-COLOR_RESET = "\033[0m"
-COLOR_BLUE = "\033[94m"
-COLOR_GREEN = "\033[92m"
-COLOR_YELLOW = "\033[93m"
-COLOR_MAGENTA = "\033[95m"
-COLOR_RED = "\033[91m"
+log = logging.getLogger(__name__)
 
 DOCS_DIR = "docs"
 INDEX_DIR = "index"
-CHUNKS_PATH = os.path.join(INDEX_DIR, "chunks.pkl")
-METADATA_PATH = os.path.join(INDEX_DIR, "chunks_meta.pkl")
+CHUNKS_ARROW_PATH = os.path.join(INDEX_DIR, "chunks.arrow")
 FAISS_INDEX_PATH = os.path.join(INDEX_DIR, "faiss.index")
 CHUNKS_JSON_PATH = os.path.join(INDEX_DIR, "chunks_with_metadata.json")
+EMBED_CACHE_DIR = os.path.join(INDEX_DIR, "embed_cache")
+EMBED_CACHE_MANIFEST_PATH = os.path.join(EMBED_CACHE_DIR, "manifest.json")
+
+# O JSON legível com todos os chunks só é gerado em modo de depuração
+WRITE_CHUNKS_JSON = os.environ.get("DEBUG", "0") == "1"
 
 # Chunk por caracteres
 CHUNK_SIZE_CHARS = 1200
 CHUNK_OVERLAP_CHARS = 300
 
+# Tipo de índice FAISS: "hnsw" (padrão), "ivfpq" (comprimido, para corpora grandes),
+# "sq_fp16" / "sq8" (busca exaustiva sobre vetores em float16 / 8 bits por dimensão) ou "flat"
+FAISS_INDEX_KIND = os.environ.get("FAISS_INDEX_KIND", "hnsw")
+
+# Parâmetros do índice HNSW (vizinhos por camada e esforço na construção do grafo)
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+
+# Parâmetros do IVFPQ (sub-quantizadores, bits por código e listas visitadas na busca).
+# Abaixo de IVFPQ_MIN_TRAIN vetores não há pontos suficientes para treinar: cai para "flat".
+IVFPQ_M = 64
+IVFPQ_NBITS = 8
+IVF_NPROBE = 8
+IVFPQ_MIN_TRAIN = 1000
+
+# Normalização de espaços do texto extraído dos PDFs
+_WS_RE = re.compile(r"[ \t]+")
+_NL_RE = re.compile(r"\n{3,}")
+
+# Quantos chunks vão em cada request para /api/embed.
+# 32 é um bom valor para CPU/MPS; em GPU CUDA use 128 (EMBED_BATCH_SIZE=128).
+EMBED_BATCH_SIZE = int(os.environ.get("EMBED_BATCH_SIZE", "32"))
+
+# Quantos batches de embedding podem estar em voo ao mesmo tempo.
+# Deve acompanhar o OLLAMA_NUM_PARALLEL configurado no servidor.
+OLLAMA_NUM_PARALLEL = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+
 
 # =========================
 # CARREGAR PDFs
 # =========================
 
+def _extract_one(path_and_name: Tuple[str, str]) -> Optional[Tuple[str, str]]:
+    """
+    Extrai o texto de um único PDF. Roda em um processo separado (ver load_pdfs).
+    """
+    path, filename = path_and_name
+    log.info("Lendo PDF: %s", filename)
+    reader = PdfReader(path)
+
+    pages_text = []
+    for page_idx, page in enumerate(reader.pages):
+        page_text = page.extract_text() or ""
+        pages_text.append(page_text)
+
+    # Normaliza os espaços uma única vez por PDF (regex em C), para o chunking não precisar de strip
+    full_text = "\n".join(pages_text)
+    full_text = _WS_RE.sub(" ", full_text)
+    full_text = _NL_RE.sub("\n\n", full_text).strip()
+    if not full_text:
+        log.warning("PDF '%s' sem texto extraível.", filename)
+        return None
+
+    return filename, full_text
+
+
 def load_pdfs(docs_dir: str = DOCS_DIR) -> List[Tuple[str, str]]:
-    print(f"{COLOR_BLUE}Carregando PDFs da pasta ./{docs_dir} ...{COLOR_RESET}")
+    log.info("Carregando PDFs da pasta ./%s ...", docs_dir)
     texts: List[Tuple[str, str]] = []
 
     if not os.path.isdir(docs_dir):
-        print(f"{COLOR_RED}Pasta '{docs_dir}' não encontrada!{COLOR_RESET}")
+        log.error("Pasta '%s' não encontrada!", docs_dir)
         return texts
 
-    for filename in os.listdir(docs_dir):
-        if filename.lower().endswith(".pdf"):
-            print(f"{COLOR_MAGENTA}Lendo PDF:{COLOR_RESET} {filename}")
-            path = os.path.join(docs_dir, filename)
-            reader = PdfReader(path)
-
-            pages_text = []
-            for page_idx, page in enumerate(reader.pages):
-                page_text = page.extract_text() or ""
-                pages_text.append(page_text)
+    paths = [
+        (os.path.join(docs_dir, filename), filename)
+        for filename in os.listdir(docs_dir)
+        if filename.lower().endswith(".pdf")
+    ]
 
-            full_text = "\n".join(pages_text).strip()
-            if full_text:
-                texts.append((filename, full_text))
-            else:
-                print(f"{COLOR_YELLOW}AVISO: PDF '{filename}' sem texto extraível.{COLOR_RESET}")
+    # Processos (e não threads): o pypdf segura o GIL durante a extração de texto
+    if paths:
+        with ProcessPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as ex:
+            results = list(ex.map(_extract_one, paths))
+        texts = [r for r in results if r is not None]
 
-    print(f"{COLOR_GREEN}{len(texts)} documento(s) PDF carregado(s).{COLOR_RESET}")
+    log.info("%d documento(s) PDF carregado(s).", len(texts))
     return texts
 
 
@@ -67,6 +133,15 @@ def load_pdfs(docs_dir: str = DOCS_DIR) -> List[Tuple[str, str]]:
 # CHUNKING (por CARACTERES)
 # =========================
 
+def _chunk_offsets(n: int, size: int, overlap: int) -> np.ndarray:
+    """
+    Calcula todas as janelas [início, fim) (em caracteres) de uma vez, como um array (M, 2) int64.
+    """
+    starts = np.arange(0, n, size - overlap, dtype=np.int64)  # avança com sobreposição
+    ends = np.minimum(starts + size, n)
+    return np.stack([starts, ends], axis=1)
+
+
 def chunk_text(
     text: str,
     chunk_size_chars: int = CHUNK_SIZE_CHARS,
@@ -75,16 +150,27 @@ def chunk_text(
 
     chunks: List[str] = []
     n = len(text)
-    start = 0
-
-    while start < n:
-        end = start + chunk_size_chars
-        chunk = text[start:end].strip()
-        if chunk:
+    if n == 0:
+        return chunks
+
+    # Codifica o texto uma única vez e descobre, com NumPy, em que byte começa cada caractere
+    # (bytes de continuação UTF-8 têm o formato 10xxxxxx). Assim os cortes por caractere viram
+    # cortes por byte sobre um memoryview, sem fatiar o str original repetidamente.
+    data = text.encode("utf-8", "surrogatepass")
+    view = memoryview(data)
+    arr = np.frombuffer(data, dtype=np.uint8)
+    char_starts = np.flatnonzero((arr & 0xC0) != 0x80)
+    char_bounds = np.append(char_starts, len(data))
+
+    offsets = _chunk_offsets(n, chunk_size_chars, overlap_chars)
+    byte_offsets = char_bounds[offsets]
+
+    for byte_start, byte_end in byte_offsets.tolist():
+        # O texto já vem normalizado de load_pdfs: só é preciso descartar janelas sem conteúdo
+        chunk = str(view[byte_start:byte_end], "utf-8", "surrogatepass")
+        if chunk and not chunk.isspace():
             chunks.append(chunk)
 
-        start = end - overlap_chars  # avança com sobreposição
-
     return chunks
 
 
@@ -92,20 +178,20 @@ def build_corpus_chunks(
     docs: List[Tuple[str, str]]
 ) -> Tuple[List[str], List[Dict[str, Any]]]:
 
-    print(f"{COLOR_BLUE}Iniciando chunking por documento...{COLOR_RESET}\n")
+    log.info("Iniciando chunking por documento...")
 
     all_chunks: List[str] = []
     metadata: List[Dict[str, Any]] = []
 
     for doc_name, text in docs:
-        print(f"{COLOR_MAGENTA}→ Fazendo chunking do documento:{COLOR_RESET} {doc_name}")
+        log.info("→ Fazendo chunking do documento: %s", doc_name)
         chunks_doc = chunk_text(text)
 
         for i, chunk in enumerate(chunks_doc):
             all_chunks.append(chunk)
             metadata.append({"doc_name": doc_name, "chunk_id": i})
 
-    print(f"\n{COLOR_GREEN}Total de {len(all_chunks)} chunks gerados para o corpus.{COLOR_RESET}\n")
+    log.info("Total de %d chunks gerados para o corpus.", len(all_chunks))
     return all_chunks, metadata
 
 
@@ -113,123 +199,354 @@ def build_corpus_chunks(
 # EMBEDDINGS + FAISS
 # =========================
 
-def embed_chunks_with_logging(
+# =========================
+# CACHE DE EMBEDDINGS EM DISCO
+# =========================
+
+def update_embedding_cache_manifest(
+    keys: List[str],
+    metadata: List[Dict[str, Any]],
+) -> None:
+    """
+    Grava o manifest (doc_name -> hashes) do corpus atual e remove do cache
+    as entradas que não pertencem mais a nenhum documento (ex.: PDF apagado ou alterado).
+    """
+    manifest: Dict[str, List[str]] = {}
+    for key, meta in zip(keys, metadata):
+        manifest.setdefault(meta.get("doc_name"), []).append(key)
+
+    old_manifest: Dict[str, List[str]] = {}
+    if os.path.exists(EMBED_CACHE_MANIFEST_PATH):
+        with open(EMBED_CACHE_MANIFEST_PATH, "r", encoding="utf-8") as f:
+            old_manifest = json.load(f)
+
+    current = set(keys)
+    orphans = {k for hashes in old_manifest.values() for k in hashes} - current
+    for key in orphans:
+        path = embedding_cache_path(key, EMBED_CACHE_DIR)
+        if os.path.exists(path):
+            os.remove(path)
+    if orphans:
+        log.info("Cache de embeddings: %d entrada(s) órfã(s) removida(s).", len(orphans))
+
+    os.makedirs(EMBED_CACHE_DIR, exist_ok=True)
+    with open(EMBED_CACHE_MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump({doc: sorted(set(hashes)) for doc, hashes in manifest.items()}, f, indent=2)
+
+
+async def _embed_batch_items_individually(
+    client: ollama.AsyncClient,
+    batch_idxs: List[int],
+    chunks: List[str],
+    metadata: List[Dict[str, Any]],
+    model: str,
+) -> List[Tuple[int, List[float]]]:
+    """
+    Fallback usado quando um batch inteiro falha: tenta cada chunk do batch
+    separadamente, para que um único chunk problemático não derrube o batch todo.
+    """
+    ok: List[Tuple[int, List[float]]] = []
+    for i in batch_idxs:
+        meta = metadata[i]
+        try:
+            res = await client.embed(model=model, input=[chunks[i]])
+            ok.append((i, res["embeddings"][0]))
+        except Exception as e:
+            log.error(
+                "ERRO ao gerar embedding do chunk (doc=%s, chunk=%s). Ignorando este chunk. Detalhe: %s",
+                meta.get("doc_name"), meta.get("chunk_id"), e,
+            )
+    return ok
+
+
+async def embed_chunks_with_logging(
     chunks: List[str],
     metadata: List[Dict[str, Any]],
     model: str = EMBED_MODEL,
+    batch_size: int = EMBED_BATCH_SIZE,
 ) -> Tuple[np.ndarray, List[str], List[Dict[str, Any]]]:
 
-    print(f"{COLOR_BLUE}Gerando embeddings com Ollama (pode levar algum tempo)...{COLOR_RESET}")
-
-    vectors = []
-    chunks_ok: List[str] = []
-    metadata_ok: List[Dict[str, Any]] = []
+    log.info("Gerando embeddings com %s (pode levar algum tempo)...", EMBED_BACKEND)
 
     total = len(chunks)
-    for i, (chunk, meta) in enumerate(zip(chunks, metadata)):
-        print(
-            f"{COLOR_YELLOW}Embedding chunk {meta.get('chunk_id')} "
-            f"de '{meta.get('doc_name')}' ({i + 1}/{total})...{COLOR_RESET}"
-        )
+    keys = [embedding_cache_key(chunk, model) for chunk in chunks]
+
+    # Matriz final pré-alocada assim que a dimensão é conhecida (primeiro vetor obtido):
+    # cada embedding é escrito direto na sua linha, sem lista intermediária + np.array no fim
+    out: np.ndarray | None = None
+    ok = np.zeros(total, dtype=bool)
+
+    def _store(i: int, emb: Any) -> None:
+        nonlocal out
+        if out is None:
+            out = np.empty((total, len(emb)), dtype="float32")
+        out[i] = emb
+        ok[i] = True
+
+    # Chunks idênticos (ex.: cabeçalhos/rodapés repetidos) são embedados uma única vez:
+    # as repetições só copiam a linha do primeiro chunk com o mesmo hash
+    seen: Dict[str, int] = {}
+    duplicates: List[Tuple[int, int]] = []
+
+    # Embeddings já calculados em execuções anteriores não voltam para o Ollama
+    missing: List[int] = []
+    for i, key in enumerate(keys):
+        if key in seen:
+            duplicates.append((i, seen[key]))
+            continue
+        seen[key] = i
 
-        try:
-            res = ollama.embeddings(model=model, prompt=chunk)
-            emb = res["embedding"]
+        cached = load_cached_embedding(key, EMBED_CACHE_DIR)
+        if cached is not None:
+            _store(i, cached)
+        else:
+            missing.append(i)
 
-            vectors.append(emb)
-            chunks_ok.append(chunk)
-            metadata_ok.append(meta)
+    log.info(
+        "Cache de embeddings: %d reaproveitado(s), %d a calcular, %d chunk(s) duplicado(s).",
+        len(seen) - len(missing), len(missing), len(duplicates),
+    )
 
-        except Exception as e:
-            print(
-                f"{COLOR_RED}ERRO ao gerar embedding do chunk "
-                f"(doc={meta.get('doc_name')}, chunk={meta.get('chunk_id')}). "
-                f"Ignorando este chunk.\nDetalhe: {e}{COLOR_RESET}\n"
+    if EMBED_BACKEND == "sentence-transformers" and missing:
+        # Modelo local: o encode já faz o batching (GPU/MPS) e não falha por item,
+        # então os chunks que faltam vão numa única chamada
+        embs = embed_texts(
+            [chunks[i] for i in missing], model=model, show_progress_bar=True, cache_dir=None
+        )
+        for i, emb in zip(missing, embs):
+            save_cached_embedding(keys[i], emb, EMBED_CACHE_DIR)
+            _store(i, emb)
+        missing = []
+
+    batches = [missing[start:start + batch_size] for start in range(0, len(missing), batch_size)]
+    results: List[Any] = []
+    if batches:
+        # O cliente só é criado se houver o que embedar, e é fechado ao final (pool do httpx)
+        async with ollama.AsyncClient() as client:
+            # Limita quantos batches ficam em voo ao mesmo tempo (paralelismo do servidor Ollama)
+            semaphore = asyncio.Semaphore(OLLAMA_NUM_PARALLEL)
+
+            async def _one(batch_idxs: List[int]) -> List[Tuple[int, List[float]]]:
+                batch_chunks = [chunks[i] for i in batch_idxs]
+
+                async with semaphore:
+                    log.info("Embedding de %d chunk(s) (até o chunk %d/%d)...", len(batch_chunks), batch_idxs[-1] + 1, total)
+
+                    # /api/embed aceita uma lista em "input": um único request HTTP por batch
+                    try:
+                        res = await client.embed(model=model, input=batch_chunks)
+                        embs = res["embeddings"]
+                        if len(embs) != len(batch_chunks):
+                            raise ValueError(
+                                f"{len(embs)} embeddings retornados para {len(batch_chunks)} chunks"
+                            )
+                        return list(zip(batch_idxs, embs))
+
+                    except Exception as e:
+                        log.warning(
+                            "ERRO no batch que termina no chunk %d. Tentando os chunks um a um. Detalhe: %s",
+                            batch_idxs[-1] + 1, e,
+                        )
+                        return await _embed_batch_items_individually(client, batch_idxs, chunks, metadata, model)
+
+            results = await asyncio.gather(*[_one(b) for b in batches], return_exceptions=True)
+
+    for batch_idxs, result in zip(batches, results):
+        if isinstance(result, BaseException):
+            log.error(
+                "ERRO inesperado no batch que termina no chunk %d. Ignorando este batch. Detalhe: %s",
+                batch_idxs[-1] + 1, result,
             )
             continue
 
-    if not vectors:
+        for i, emb in result:
+            save_cached_embedding(keys[i], emb, EMBED_CACHE_DIR)
+            _store(i, emb)
+
+    for i, first in duplicates:
+        if ok[first]:
+            _store(i, out[first])
+
+    ok_idx = np.flatnonzero(ok).tolist()
+    if out is None or not ok_idx:
         raise RuntimeError(
-            f"{COLOR_RED}Nenhum embedding foi gerado — Ollama pode estar offline ou com falha.{COLOR_RESET}"
+            "Nenhum embedding foi gerado — Ollama pode estar offline ou com falha."
         )
 
-    print(f"{COLOR_GREEN}Embeddings gerados com sucesso: {len(vectors)} chunks.{COLOR_RESET}")
-    return np.array(vectors, dtype="float32"), chunks_ok, metadata_ok
-
+    # Compacta as linhas que deram certo no próprio buffer (mantendo a ordem original,
+    # para chunks e metadados continuarem alinhados) e devolve uma view, sem cópia
+    for w, j in enumerate(ok_idx):
+        if w != j:
+            out[w] = out[j]
+    embeddings = out[:len(ok_idx)]
+    # Normaliza para norma 1 (in-place): com isso o índice usa produto interno = cosseno,
+    # igual ao que o rag_core faz com o embedding da query
+    faiss.normalize_L2(embeddings)
+    chunks_ok = [chunks[j] for j in ok_idx]
+    metadata_ok = [metadata[j] for j in ok_idx]
+
+    update_embedding_cache_manifest(keys, metadata)
+
+    log.info("Embeddings gerados com sucesso: %d chunks.", len(ok_idx))
+    return embeddings, chunks_ok, metadata_ok
+
+
+def _pq_subquantizers(dim: int, m: int = IVFPQ_M) -> int:
+    # O PQ exige que a dimensão seja divisível pelo número de sub-quantizadores
+    while dim % m:
+        m -= 1
+    return m
+
+
+def build_faiss_index(embeddings: np.ndarray, kind: str = FAISS_INDEX_KIND) -> faiss.Index:
+    """
+    Monta o índice FAISS escolhido em FAISS_INDEX_KIND. Os embeddings devem vir
+    normalizados: todos os tipos usam produto interno (METRIC_INNER_PRODUCT) como similaridade.
+    """
+    n, dim = embeddings.shape
+
+    if kind == "ivfpq" and n < IVFPQ_MIN_TRAIN:
+        log.warning(
+            "Apenas %d vetores: poucos para treinar IVFPQ (mínimo %d). Usando IndexFlatIP.",
+            n, IVFPQ_MIN_TRAIN,
+        )
+        kind = "flat"
+
+    log.info("Construindo índice FAISS (%s) na memória...", kind)
+
+    if kind == "hnsw":
+        # HNSW: busca aproximada em tempo ~logarítmico, em vez de varrer todos os vetores
+        index = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    elif kind == "ivfpq":
+        # IVFPQ: cada vetor vira ~m bytes (em vez de 4*dim), com pouca perda de recall
+        nlist = max(4, int(4 * math.sqrt(n)))
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFPQ(
+            quantizer, dim, nlist, _pq_subquantizers(dim), IVFPQ_NBITS, faiss.METRIC_INNER_PRODUCT
+        )
+        index.train(embeddings)
+        index.nprobe = IVF_NPROBE
+    elif kind == "sq_fp16":
+        # Vetores guardados em float16: metade da memória e da banda lida em cada busca
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+        index.train(embeddings)
+    elif kind == "sq8":
+        # 1 byte por dimensão (4x menos que float32); o treino aprende o intervalo de cada
+        # dimensão e a query é comparada com os códigos sem ser quantizada
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+        index.train(embeddings)
+    elif kind == "flat":
+        index = faiss.IndexFlatIP(dim)
+    else:
+        raise ValueError(f"Tipo de índice FAISS desconhecido: {kind!r}")
 
-def build_faiss_index(embeddings: np.ndarray) -> faiss.IndexFlatL2:
-    print(f"{COLOR_BLUE}Construindo índice FAISS na memória...{COLOR_RESET}")
-    dim = embeddings.shape[1]
-    index = faiss.IndexFlatL2(dim)
     index.add(embeddings)
-    print(f"{COLOR_GREEN}Índice FAISS criado com dimensão {dim}.{COLOR_RESET}")
+    log.info("Índice FAISS criado com dimensão %d (%s).", dim, kind)
     return index
 
 
+async def _write_files_aio(files: Dict[str, bytes]) -> None:
+    async def _write(path: str, data: bytes) -> None:
+        async with aiofile.async_open(path, "wb") as f:
+            await f.write(data)
+
+    await asyncio.gather(*[_write(path, data) for path, data in files.items()])
+
+
+def _write_files(files: Dict[str, bytes]) -> None:
+    """
+    Grava vários arquivos já serializados. No Linux, com o aiofile instalado,
+    as escritas são submetidas ao kernel ao mesmo tempo; senão, uma por vez.
+    """
+    if aiofile is not None and sys.platform == "linux":
+        asyncio.run(_write_files_aio(files))
+        return
+
+    for path, data in files.items():
+        with open(path, "wb") as f:
+            f.write(data)
+
+
 def save_index_and_chunks(
-    index: faiss.IndexFlatL2,
+    index: faiss.Index,
     chunks: List[str],
     metadata: List[Dict[str, Any]],
 ) -> None:
 
-    print(f"{COLOR_BLUE}Salvando índice e metadados no disco...{COLOR_RESET}")
+    log.info("Salvando índice e metadados no disco...")
     os.makedirs(INDEX_DIR, exist_ok=True)
 
-    faiss.write_index(index, FAISS_INDEX_PATH)
-    print(f"{COLOR_GREEN}→ Índice salvo em: {FAISS_INDEX_PATH}{COLOR_RESET}")
+    # Tudo é serializado em memória primeiro, para as escritas em disco poderem ocorrer juntas
+    files: Dict[str, bytes] = {}
 
-    with open(CHUNKS_PATH, "wb") as f:
-        pickle.dump(chunks, f)
-    print(f"{COLOR_GREEN}→ Chunks salvos em: {CHUNKS_PATH}{COLOR_RESET}")
+    files[FAISS_INDEX_PATH] = faiss.serialize_index(index).tobytes()
 
-    with open(METADATA_PATH, "wb") as f:
-        pickle.dump(metadata, f)
-    print(f"{COLOR_GREEN}→ Metadados salvos em: {METADATA_PATH}{COLOR_RESET}")
+    # Chunks + metadados num único arquivo Arrow IPC colunar (lido via mmap, sem desserializar)
+    tbl = pa.table({
+        "text": pa.array(chunks, type=pa.string()),
+        "doc_name": pa.array([m.get("doc_name") for m in metadata], type=pa.string()),
+        "chunk_id": pa.array([m.get("chunk_id") for m in metadata], type=pa.int32()),
+    })
+    sink = pa.BufferOutputStream()
+    with ipc.new_file(sink, tbl.schema) as writer:
+        writer.write_table(tbl)
+    files[CHUNKS_ARROW_PATH] = sink.getvalue().to_pybytes()
 
-    # JSON legível
-    chunks_for_json = []
-    for i, (chunk_text, meta) in enumerate(zip(chunks, metadata)):
-        chunks_for_json.append({
-            "global_chunk_idx": i,
-            "doc_name": meta.get("doc_name"),
-            "chunk_id": meta.get("chunk_id"),
-            "text": chunk_text,
-        })
+    if WRITE_CHUNKS_JSON:
+        # JSON legível (só para depuração: DEBUG=1)
+        chunks_for_json = []
+        for i, (chunk_text, meta) in enumerate(zip(chunks, metadata)):
+            chunks_for_json.append({
+                "global_chunk_idx": i,
+                "doc_name": meta.get("doc_name"),
+                "chunk_id": meta.get("chunk_id"),
+                "text": chunk_text,
+            })
 
-    with open(CHUNKS_JSON_PATH, "w", encoding="utf-8") as f:
-        json.dump(chunks_for_json, f, ensure_ascii=False, indent=2)
+        # orjson serializa direto para bytes UTF-8 (sem etapa de encoding do texto)
+        files[CHUNKS_JSON_PATH] = orjson.dumps(chunks_for_json, option=orjson.OPT_INDENT_2)
 
-    print(f"{COLOR_GREEN}→ JSON legível salvo em: {CHUNKS_JSON_PATH}{COLOR_RESET}")
+    _write_files(files)
+
+    log.info("→ Índice salvo em: %s", FAISS_INDEX_PATH)
+    log.info("→ Chunks e metadados salvos em: %s", CHUNKS_ARROW_PATH)
+    if WRITE_CHUNKS_JSON:
+        log.info("→ JSON legível salvo em: %s", CHUNKS_JSON_PATH)
 
 
 def main():
-    print(f"{COLOR_BLUE}=== INICIANDO INDEXAÇÃO ==={COLOR_RESET}")
+    setup_logging()
+    log.info("=== INICIANDO INDEXAÇÃO ===")
 
     docs = load_pdfs()
     if not docs:
-        print(f"{COLOR_RED}Nenhum PDF encontrado. Abortando.{COLOR_RESET}")
+        log.error("Nenhum PDF encontrado. Abortando.")
         return
 
     chunks, metadata = build_corpus_chunks(docs)
 
-    embeddings, chunks_ok, metadata_ok = embed_chunks_with_logging(
-        chunks, metadata, model=EMBED_MODEL
+    embeddings, chunks_ok, metadata_ok = asyncio.run(
+        embed_chunks_with_logging(chunks, metadata, model=EMBED_MODEL)
     )
 
     index = build_faiss_index(embeddings)
 
     save_index_and_chunks(index, chunks_ok, metadata_ok)
 
-    print(f"\n{COLOR_GREEN}Indexação concluída com sucesso!{COLOR_RESET}\n")
+    log.info("Indexação concluída com sucesso!")
+
+    if not log.isEnabledFor(logging.INFO):
+        return
 
-    print(f"{COLOR_BLUE}Exemplos de chunks indexados:{COLOR_RESET}")
+    log.info("Exemplos de chunks indexados:")
     for i, (chunk, meta) in enumerate(zip(chunks_ok, metadata_ok)):
         if i >= 3:
             break
         preview = chunk[:200].replace("\n", " ")
-        print(
-            f"{COLOR_YELLOW}- global_chunk_idx={i}, doc={meta.get('doc_name')}, "
-            f"chunk_id={meta.get('chunk_id')}{COLOR_RESET}\n  {preview!r}\n"
+        log.info(
+            "- global_chunk_idx=%d, doc=%s, chunk_id=%s\n  %r",
+            i, meta.get("doc_name"), meta.get("chunk_id"), preview,
         )
 
 
@@ -0,0 +1,61 @@
+import logging
+import os
+import sys
+
+# ======= Cores para logs (ANSI) =======
+COLOR_RESET = "\033[0m"
+COLOR_BLUE = "\033[94m"
+COLOR_GREEN = "\033[92m"
+COLOR_YELLOW = "\033[93m"
+COLOR_MAGENTA = "\033[95m"
+COLOR_RED = "\033[91m"
+COLOR_CYAN = "\033[96m"
+
+LEVEL_COLORS = {
+    logging.DEBUG: COLOR_MAGENTA,
+    logging.INFO: COLOR_BLUE,
+    logging.WARNING: COLOR_YELLOW,
+    logging.ERROR: COLOR_RED,
+    logging.CRITICAL: COLOR_RED,
+}
+
+
+def suporta_cor(stream=None) -> bool:
+    # Códigos ANSI só fazem sentido num terminal (em arquivos/pipes só atrapalham)
+    stream = stream if stream is not None else sys.stdout
+    return hasattr(stream, "isatty") and stream.isatty()
+
+
+def cor(codigo: str, stream=None) -> str:
+    """Devolve o código ANSI se o stream (padrão: stdout) for um terminal, senão ""."""
+    return codigo if suporta_cor(stream) else ""
+
+
+class ColorFormatter(logging.Formatter):
+    """
+    Formatter que pinta a mensagem com a cor do nível, mas só quando a saída é um terminal
+    (em arquivos/pipes os códigos ANSI só atrapalham).
+    """
+
+    def __init__(self, fmt: str = "%(message)s", stream=None) -> None:
+        super().__init__(fmt)
+        self.use_color = suporta_cor(stream if stream is not None else sys.stderr)
+
+    def format(self, record: logging.LogRecord) -> str:
+        msg = super().format(record)
+        if not self.use_color:
+            return msg
+        return f"{LEVEL_COLORS.get(record.levelno, '')}{msg}{COLOR_RESET}"
+
+
+def setup_logging() -> None:
+    """
+    Configura o logging dos scripts: por padrão só WARNING ou acima;
+    com VERBOSE=1 no ambiente, também as mensagens INFO de progresso;
+    com VERBOSE=2, também as DEBUG (ex.: a lista de resultados de cada busca).
+    """
+    verbose = os.environ.get("VERBOSE", "0")
+    level = {"1": logging.INFO, "2": logging.DEBUG}.get(verbose, logging.WARNING)
+    handler = logging.StreamHandler()
+    handler.setFormatter(ColorFormatter(stream=handler.stream))
+    logging.basicConfig(level=level, handlers=[handler])
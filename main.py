@@ -1,60 +1,132 @@
+import logging
 import os
-import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Tuple
 
 import faiss
-
-from rag_core import rag_retrieve
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+import logging_utils
+from logging_utils import cor, setup_logging
+from rag_core import (
+    aquecer_modelos,
+    configurar_threads_faiss,
+    limpar_caches_de_consulta,
+    rag_retrieve,
+)
 from agents import agente_prepara_aula, agente_tarefas_casa
 
+log = logging.getLogger(__name__)
+
 INDEX_DIR = "index"
-CHUNKS_PATH = os.path.join(INDEX_DIR, "chunks.pkl")
-METADATA_PATH = os.path.join(INDEX_DIR, "chunks_meta.pkl")
+CHUNKS_ARROW_PATH = os.path.join(INDEX_DIR, "chunks.arrow")
 FAISS_INDEX_PATH = os.path.join(INDEX_DIR, "faiss.index")
 
-# ======= Cores para logs (ANSI) =======
-COLOR_RESET = "\033[0m"
-COLOR_BLUE = "\033[94m"
-COLOR_GREEN = "\033[92m"
-COLOR_YELLOW = "\033[93m"
-COLOR_MAGENTA = "\033[95m"
-COLOR_RED = "\033[91m"
-COLOR_CYAN = "\033[96m"
+# ======= Cores para a saída (ANSI) =======
+# Vazias quando a stdout não é um terminal (saída redirecionada ou em pipe)
+COLOR_RESET = cor(logging_utils.COLOR_RESET)
+COLOR_BLUE = cor(logging_utils.COLOR_BLUE)
+COLOR_GREEN = cor(logging_utils.COLOR_GREEN)
+COLOR_YELLOW = cor(logging_utils.COLOR_YELLOW)
+COLOR_MAGENTA = cor(logging_utils.COLOR_MAGENTA)
+COLOR_RED = cor(logging_utils.COLOR_RED)
+COLOR_CYAN = cor(logging_utils.COLOR_CYAN)
+
+
+def _ler_indice(path: str) -> faiss.Index:
+    """
+    Lê o índice FAISS com mmap (IO_FLAG_MMAP): o SO só traz para a memória as páginas
+    realmente tocadas na busca, e vários processos compartilham as mesmas páginas.
+    Se o build do FAISS não suportar mmap para esse tipo de índice, faz a leitura normal.
+    """
+    try:
+        return faiss.read_index(path, faiss.IO_FLAG_MMAP)
+    except Exception:
+        return faiss.read_index(path)
+
+
+# Memória temporária (scratch) reservada pelo FAISS na GPU; o padrão dele é uma fração
+# grande da VRAM, que aqui disputaria espaço com os modelos do Ollama
+FAISS_GPU_TEMP_MEMORY = 64 * 1024 * 1024
 
+# Os recursos da GPU precisam viver enquanto o índice em GPU existir
+_GPU_RESOURCES = []
 
-def load_index_and_data():
+
+def _mover_para_gpu(index: faiss.Index) -> faiss.Index:
+    """
+    Copia o índice para a GPU (build faiss-gpu): com uma GPU, usa StandardGpuResources com
+    scratch limitado a FAISS_GPU_TEMP_MEMORY; com várias, replica em todas. Sem GPU, ou se
+    o tipo de índice não tiver versão em GPU (ex.: HNSW), devolve o próprio índice em CPU.
     """
-    Carrega o índice FAISS, os chunks e os metadados do disco.
+    num_gpus = getattr(faiss, "get_num_gpus", lambda: 0)()
+    if num_gpus == 0:
+        return index
+    try:
+        if num_gpus == 1:
+            res = faiss.StandardGpuResources()
+            res.setTempMemory(FAISS_GPU_TEMP_MEMORY)
+            gpu_index = faiss.index_cpu_to_gpu(res, 0, index)
+            _GPU_RESOURCES.append(res)
+        else:
+            gpu_index = faiss.index_cpu_to_all_gpus(index)
+    except Exception as e:
+        log.warning("Índice mantido na CPU (não suportado em GPU): %s", e)
+        return index
+    log.info("Índice FAISS copiado para %d GPU(s).", num_gpus)
+    return gpu_index
+
+
+def load_index_and_data() -> Tuple[
+    Optional[faiss.Index], Optional[pa.ChunkedArray], Optional[np.ndarray], Optional[np.ndarray]
+]:
+    """
+    Carrega o índice FAISS, os chunks e os metadados (chunks.arrow) do disco.
+
+    Os chunks (coluna "text") continuam como coluna Arrow sobre o arquivo mapeado: só os
+    textos dos top_k resultados de cada busca viram strings Python. Os metadados vêm em
+    arrays paralelos (doc_names: object, chunk_ids: int32), um valor por chunk.
     """
     if not (
         os.path.exists(FAISS_INDEX_PATH)
-        and os.path.exists(CHUNKS_PATH)
-        and os.path.exists(METADATA_PATH)
+        and os.path.exists(CHUNKS_ARROW_PATH)
     ):
-        return None, None, None
+        return None, None, None, None
 
-    index = faiss.read_index(FAISS_INDEX_PATH)
+    index = _mover_para_gpu(_ler_indice(FAISS_INDEX_PATH))
 
-    with open(CHUNKS_PATH, "rb") as f:
-        chunks = pickle.load(f)
+    # Arquivo Arrow IPC mapeado em memória: as colunas são lidas sem cópia (carga O(1))
+    source = pa.memory_map(CHUNKS_ARROW_PATH, "r")
+    tbl = ipc.open_file(source).read_all()
 
-    with open(METADATA_PATH, "rb") as f:
-        metadata = pickle.load(f)
+    chunks = tbl.column("text")
+    doc_names = tbl.column("doc_name").to_numpy()
+    chunk_ids = tbl.column("chunk_id").to_numpy().astype(np.int32, copy=False)
 
-    return index, chunks, metadata
+    return index, chunks, doc_names, chunk_ids
 
 
 def main():
+    setup_logging()
+    configurar_threads_faiss()
+    limpar_caches_de_consulta()
     print(f"{COLOR_BLUE}Carregando índice existente em ./index ...{COLOR_RESET}")
-    index, chunks, metadata = load_index_and_data()
-    if index is None or chunks is None or metadata is None:
+    index, chunks, doc_names, chunk_ids = load_index_and_data()
+    if index is None or chunks is None or doc_names is None or chunk_ids is None:
         print(f"{COLOR_RED}Índice ou arquivos de chunks/metadados não encontrados.{COLOR_RESET}")
         print(f"{COLOR_YELLOW}Rode primeiro:{COLOR_RESET}  python index_builder.py")
         return
 
+    # Carrega os modelos no Ollama enquanto o usuário digita a primeira pergunta
+    threading.Thread(target=aquecer_modelos, daemon=True).start()
+
     print(f"{COLOR_GREEN}Índice carregado. {len(chunks)} trechos disponíveis.{COLOR_RESET}\n")
 
     # Mostrar quais documentos estão presentes no índice
-    doc_names_unicos = sorted({m.get("doc_name") for m in metadata})
+    doc_names_unicos = sorted(set(doc_names.tolist()))
     print(f"{COLOR_CYAN}Documentos presentes no índice ({len(doc_names_unicos)}):{COLOR_RESET}")
     for name in doc_names_unicos:
         print(f" - {name}")
@@ -76,8 +148,8 @@ def main():
             print(f"{COLOR_GREEN}Encerrando. Até mais!{COLOR_RESET}")
             break
 
-        print(f"\n{COLOR_BLUE}[1/3] Recuperando contextos relevantes no acervo (RAG)...{COLOR_RESET}")
-        retrieved_items = rag_retrieve(tema, index, chunks, metadata)
+        print(f"\n{COLOR_BLUE}[1/2] Recuperando contextos relevantes no acervo (RAG)...{COLOR_RESET}")
+        retrieved_items = rag_retrieve(tema, index, chunks, doc_names, chunk_ids)
 
         if not retrieved_items:
             print(f"{COLOR_RED}Nenhum contexto relevante encontrado.{COLOR_RESET}")
@@ -96,22 +168,24 @@ def main():
         contextos_texto = [item["text"] for item in retrieved_items]
         nomes_docs = [item.get("doc_name", "Documento_desconhecido.pdf") for item in retrieved_items]
 
-        print(f"{COLOR_BLUE}[2/3] Gerando plano de aula (Agente de Aula)...{COLOR_RESET}")
-        plano_aula = agente_prepara_aula(tema, contextos_texto, nomes_docs=nomes_docs)
-
-        print(f"{COLOR_BLUE}[3/3] Gerando tarefas de casa (Agente de Tarefas)...{COLOR_RESET}")
-        tarefas_casa = agente_tarefas_casa(tema, contextos_texto, nomes_docs=nomes_docs)
-
-        # Exibição no terminal (mesmo já salvando em arquivos .md pelos agentes)
-        print("\n" + "=" * 80)
-        print(f"{COLOR_GREEN}PLANO DE AULA{COLOR_RESET}")
-        print("=" * 80)
-        print(plano_aula)
-
-        print("\n" + "=" * 80)
-        print(f"{COLOR_GREEN}TAREFAS DE CASA{COLOR_RESET}")
-        print("=" * 80)
-        print(tarefas_casa)
+        print(
+            f"{COLOR_BLUE}[2/2] Gerando plano de aula e tarefas de casa "
+            f"(Agente de Aula e Agente de Tarefas, em paralelo)...{COLOR_RESET}"
+        )
+        # Os dois agentes são independentes e passam quase todo o tempo esperando o Ollama
+        # (I/O), então rodam em threads; cada resultado é exibido assim que fica pronto
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            futures = {
+                ex.submit(agente_prepara_aula, tema, contextos_texto, nomes_docs=nomes_docs): "PLANO DE AULA",
+                ex.submit(agente_tarefas_casa, tema, contextos_texto, nomes_docs=nomes_docs): "TAREFAS DE CASA",
+            }
+
+            # Exibição no terminal (mesmo já salvando em arquivos .md pelos agentes)
+            for future in as_completed(futures):
+                print("\n" + "=" * 80)
+                print(f"{COLOR_GREEN}{futures[future]}{COLOR_RESET}")
+                print("=" * 80)
+                print(future.result())
         print("\n")
 
 
@@ -1,70 +1,551 @@
-from typing import List, Dict, Any
+import asyncio
+import functools
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Tuple
 
 import numpy as np
 import faiss
 import ollama
+import pyarrow as pa
+
+log = logging.getLogger(__name__)
+
+# Backend de embeddings: "ollama" (padrão, via HTTP) ou "sentence-transformers"
+# (modelo local rodando no próprio processo, com batching nativo em GPU/MPS).
+# O Ollama continua sendo usado para geração de texto nos dois casos.
+EMBED_BACKEND = os.environ.get("EMBED_BACKEND", "ollama")
+OLLAMA_EMBED_MODEL = "nomic-embed-text:v1.5"
+ST_EMBED_MODEL = "BAAI/bge-small-en-v1.5"
 
 # Modelo de embedding usado tanto na indexação quanto na query
-EMBED_MODEL = "nomic-embed-text:v1.5"
+EMBED_MODEL = ST_EMBED_MODEL if EMBED_BACKEND == "sentence-transformers" else OLLAMA_EMBED_MODEL
+ST_BATCH_SIZE = 64
 TOP_K_DEFAULT = 20
 
+# Tamanho da lista de candidatos do HNSW na busca (maior = mais recall, mais lento)
+HNSW_EF_SEARCH = 64
+
+# Threads OpenMP do FAISS na busca. Com uma query por vez (rag_retrieve), o custo de
+# acordar muitas threads domina e 1 thread costuma ser o mais rápido; buscas em lote
+# (rag_retrieve_batch com muitas queries) ganham com mais threads.
+FAISS_NUM_THREADS = int(os.environ.get("FAISS_NUM_THREADS", "1"))
+
+# Cache em disco (entre execuções) das traduções e dos embeddings gerados na consulta.
+# O índice mantém o próprio cache de embeddings dos chunks (index/embed_cache).
+RAG_CACHE_DIR = ".rag_cache"
+QUERY_EMBED_CACHE_DIR = os.path.join(RAG_CACHE_DIR, "embeddings")
+TRANSLATION_CACHE_DIR = os.path.join(RAG_CACHE_DIR, "traducoes")
+# Limites desses caches: arquivos mais velhos que o TTL saem, e acima do teto saem os mais antigos
+RAG_CACHE_TTL_DAYS = int(os.environ.get("RAG_CACHE_TTL_DAYS", "30"))
+RAG_CACHE_MAX_FILES = int(os.environ.get("RAG_CACHE_MAX_FILES", "5000"))
+
+# Deduplicação dos resultados: trechos cuja similaridade de Jaccard (sobre 5-gramas de
+# palavras) com um resultado melhor ranqueado passe do limiar são descartados
+DEDUP_SHINGLE_SIZE = 5
+DEDUP_JACCARD_THRESHOLD = 0.7
+
+# Cache semântico de queries: queries quase idênticas reaproveitam o resultado da busca
+QUERY_CACHE_SIM_THRESHOLD = 0.95
+QUERY_CACHE_MAX_ENTRIES = 1024
+
 # Modelo de linguagem para tradução (pode ser o mesmo que você usa nos agentes)
 LLM_MODEL_TRADUCAO = "gemma3:4b"
 
 
-def embed_texts(texts: List[str], model: str = EMBED_MODEL) -> np.ndarray:
+def configurar_threads_faiss(num_threads: int = FAISS_NUM_THREADS) -> None:
     """
-    Gera embeddings usando o Ollama.
-    Retorna um array NumPy (n_texts, dim).
+    Ajusta o número de threads do FAISS para a busca. Chamado pelo main.py, e não na
+    importação deste módulo, para não limitar também a construção do índice.
     """
-    vectors = []
-    for t in texts:
-        res = ollama.embeddings(model=model, prompt=t)
-        emb = res["embedding"]
-        vectors.append(emb)
+    faiss.omp_set_num_threads(max(1, min(num_threads, os.cpu_count() or 1)))
 
-    return np.array(vectors, dtype="float32")
 
+# =========================
+# CACHE DE EMBEDDINGS EM DISCO
+# =========================
 
-def traduzir_para_ingles(texto: str) -> str:
+def embedding_cache_key(text: str, model: str) -> str:
+    return hashlib.sha256((model + "\x00" + text).encode("utf-8")).hexdigest()
+
+
+def embedding_cache_path(key: str, cache_dir: str) -> str:
+    # Subpastas pelos 2 primeiros caracteres do hash, para não ter milhares de arquivos num só diretório
+    return os.path.join(cache_dir, key[:2], key + ".npy")
+
+
+def load_cached_embedding(key: str, cache_dir: str) -> np.ndarray | None:
+    path = embedding_cache_path(key, cache_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        return np.load(path)
+    except Exception as e:
+        log.warning("[cache] Entrada de cache corrompida (%s), recalculando. Detalhe: %s", path, e)
+        return None
+
+
+def save_cached_embedding(key: str, emb: Any, cache_dir: str) -> None:
+    path = embedding_cache_path(key, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Escreve num arquivo temporário e troca de uma vez: quem lê em paralelo (ex.: os dois
+    # agentes embedando a mesma chave) nunca vê um .npy pela metade
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.asarray(emb, dtype="float32"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def limpar_caches_de_consulta(
+    cache_dirs: Tuple[str, ...] = (QUERY_EMBED_CACHE_DIR, TRANSLATION_CACHE_DIR),
+    ttl_days: int = RAG_CACHE_TTL_DAYS,
+    max_files: int = RAG_CACHE_MAX_FILES,
+) -> int:
     """
-    Traduz um texto (potencialmente em português) para inglês,
-    mantendo termos técnicos de IA o mais fiéis possível.
+    Aplica TTL e teto aos caches em disco da consulta (embeddings e traduções): remove os
+    arquivos modificados há mais de ttl_days e, se ainda sobrar mais que max_files em um
+    diretório, os mais antigos. Retorna quantos arquivos foram removidos.
+    """
+    removidos = 0
+    limite = time.time() - ttl_days * 86400
+    for cache_dir in cache_dirs:
+        if not os.path.isdir(cache_dir):
+            continue
+        arquivos = []
+        for shard in os.scandir(cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.is_file():
+                    arquivos.append((entry.stat().st_mtime, entry.path))
 
-    Se der algum erro, devolve o texto original.
+        arquivos.sort()
+        excesso = max(0, len(arquivos) - max_files)
+        for pos, (mtime, path) in enumerate(arquivos):
+            if pos >= excesso and mtime >= limite:
+                break
+            try:
+                os.remove(path)
+                removidos += 1
+            except OSError:
+                pass
+
+    if removidos:
+        log.info("[cache] %d arquivo(s) antigos removidos dos caches de consulta.", removidos)
+    return removidos
+
+
+_ST_MODELS: Dict[str, Any] = {}
+_ST_MODELS_LOCK = threading.Lock()
+
+
+def _get_st_model(model: str):
+    """
+    Carrega (uma vez por processo) o modelo do sentence-transformers.
+    O import é feito aqui para que a dependência só seja exigida quando o backend for usado.
+    """
+    # Lock: os agentes (em threads) e o aquecimento podem pedir o modelo ao mesmo tempo
+    with _ST_MODELS_LOCK:
+        if model not in _ST_MODELS:
+            import torch
+            from sentence_transformers import SentenceTransformer
+
+            if torch.cuda.is_available():
+                device = "cuda"
+            elif torch.backends.mps.is_available():
+                device = "mps"
+            else:
+                device = "cpu"
+            _ST_MODELS[model] = SentenceTransformer(model, device=device)
+        return _ST_MODELS[model]
+
+
+def embed_texts(
+    texts: List[str],
+    model: str = EMBED_MODEL,
+    show_progress_bar: bool = False,
+    cache_dir: str | None = None,
+) -> np.ndarray:
+    """
+    Gera embeddings usando o backend configurado em EMBED_BACKEND.
+    Retorna um array NumPy (n_texts, dim) com vetores já normalizados (norma 1),
+    de modo que o produto interno é a similaridade de cosseno.
+
+    Com cache_dir (opcional; ex.: QUERY_EMBED_CACHE_DIR), cada texto é procurado antes no cache em disco, de modo que
+    só os textos ainda não vistos vão para o modelo (acertos parciais também economizam).
+    """
+    if cache_dir is None:
+        return _normalizar(_embed_texts_uncached(texts, model, show_progress_bar))
+
+    keys = [embedding_cache_key(t, model) for t in texts]
+    cached = [load_cached_embedding(k, cache_dir) for k in keys]
+    missing = [i for i, emb in enumerate(cached) if emb is None]
+
+    if missing:
+        new_embs = _embed_texts_uncached([texts[i] for i in missing], model, show_progress_bar)
+        for i, emb in zip(missing, new_embs):
+            save_cached_embedding(keys[i], emb, cache_dir)
+            cached[i] = emb
+
+    # O cache guarda os vetores crus; a normalização é feita aqui, na saída
+    return _normalizar(np.asarray(cached, dtype=np.float32))
+
+
+def _normalizar(embs: np.ndarray) -> np.ndarray:
+    embs = np.ascontiguousarray(embs, dtype=np.float32)
+    faiss.normalize_L2(embs)
+    return embs
+
+
+# Buffer (1, dim) reaproveitado pelo embedding da query; dimensionado na primeira chamada,
+# já que a dimensão depende do modelo/backend
+_QUERY_BUF: np.ndarray | None = None
+
+
+@functools.lru_cache(maxsize=512)
+def _embed_query_cached(text: str, model: str = EMBED_MODEL) -> bytes:
+    """
+    Embedding normalizado de uma query, com cache em memória (lru_cache) na frente do
+    cache em disco: repetir a mesma query (já traduzida) na sessão não lê nem recalcula nada.
+    Devolve bytes (imutáveis, seguros para ficar no cache); erros não ficam em cache.
+    """
+    key = embedding_cache_key(text, model)
+    emb = load_cached_embedding(key, QUERY_EMBED_CACHE_DIR)
+    if emb is None:
+        emb = _embed_texts_uncached([text], model, False)[0]
+        save_cached_embedding(key, emb, QUERY_EMBED_CACHE_DIR)
+    return _normalizar(emb.reshape(1, -1)).tobytes()
+
+
+def _embed_single(text: str, model: str = EMBED_MODEL) -> np.ndarray:
+    """
+    Caminho rápido de embed_texts para uma única query (mesmos caches, mesma
+    normalização): o vetor é escrito num buffer reaproveitado entre chamadas, em vez de
+    montar um array novo a cada busca.
+
+    O buffer retornado é sobrescrito na chamada seguinte (e não é thread-safe): quem
+    precisar guardar o vetor deve copiá-lo.
+    """
+    global _QUERY_BUF
+
+    emb = np.frombuffer(_embed_query_cached(text, model), dtype=np.float32)
+    if _QUERY_BUF is None or _QUERY_BUF.shape[1] != emb.shape[0]:
+        _QUERY_BUF = np.empty((1, emb.shape[0]), dtype=np.float32)
+    _QUERY_BUF[0, :] = emb
+    return _QUERY_BUF
+
+
+def _embed_texts_uncached(
+    texts: List[str],
+    model: str,
+    show_progress_bar: bool,
+) -> np.ndarray:
+    if EMBED_BACKEND == "sentence-transformers":
+        embs = _get_st_model(model).encode(
+            texts,
+            batch_size=ST_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=show_progress_bar,
+        )
+        return embs.astype("float32")
+
+    # /api/embed recebe todos os textos numa única chamada HTTP
+    try:
+        res = ollama.embed(model=model, input=texts)
+        embs = res["embeddings"]
+    except (KeyError, ollama.ResponseError):
+        embs = None
+
+    if not embs:
+        # Servidores Ollama antigos não têm /api/embed: volta para um request por texto
+        embs = [ollama.embeddings(model=model, prompt=t)["embedding"] for t in texts]
+
+    return np.asarray(embs, dtype=np.float32)
+
+
+def aquecer_modelos() -> None:
+    """
+    Faz uma chamada mínima ao modelo de embedding e ao LLM de tradução, para que o Ollama
+    já os tenha carregado (e a conexão HTTP esteja aberta) quando chegar a primeira query.
+    Pensado para rodar numa thread em segundo plano: falhas só geram um aviso.
     """
     try:
-        prompt = f"""
+        if EMBED_BACKEND == "sentence-transformers":
+            _get_st_model(EMBED_MODEL)
+        else:
+            ollama.embed(model=EMBED_MODEL, input="warmup")
+        ollama.chat(
+            model=LLM_MODEL_TRADUCAO,
+            messages=[{"role": "user", "content": "ok"}],
+            options={"num_predict": 1},
+        )
+        log.info("[aquecer_modelos] Modelos de embedding e de tradução carregados.")
+    except Exception as e:
+        log.warning("[aquecer_modelos] Não foi possível pré-carregar os modelos. Detalhe: %s", e)
+
+
+# Detecção de idioma barata (sem modelo): acentos típicos do português e palavras funcionais
+_PT_CHARS_RE = re.compile(r"[ãõçáéíóúâêôàü]")
+_WORD_RE = re.compile(r"[a-zà-ÿ]+")
+_PT_STOPWORDS = frozenset(
+    "de da do das dos em na no nas nos para com um uma uns umas sobre que os as ao aos pelo pela "
+    "como mais por sem entre aula e ou se seu sua".split()
+)
+_EN_STOPWORDS = frozenset(
+    "the of and to in for with on is are what how about an from by this that into at be "
+    "using lecture level class or".split()
+)
+# Termos técnicos em inglês que, sozinhos (uma ou duas palavras), dispensam tradução.
+# Lista fechada de propósito: qualquer outro termo curto é traduzido (e a tradução fica em cache)
+_EN_TERMS = frozenset(
+    "transformer transformers attention self-attention embedding embeddings retrieval "
+    "augmented generation prompt prompts prompting fine-tuning finetuning tokenizer "
+    "tokenization backpropagation dropout diffusion deep machine learning neural network "
+    "networks reinforcement agent agents chatbot chatbots".split()
+)
+_TOKEN_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9-]*")
+
+
+def _parece_ingles(texto: str) -> bool:
+    """
+    Heurística para decidir se a query já está em inglês (e a tradução pode ser pulada).
+    Só pula quando há mais palavras funcionais do inglês que do português, ou quando a
+    query é um termo solto de uma ou duas palavras em que cada uma é uma sigla (ex.: "RAG",
+    "LLM") ou está em _EN_TERMS (ex.: "transformers", "deep learning").
+    Na dúvida, traduz: ausência de português não é evidência de inglês.
+    """
+    lower = texto.lower()
+    if _PT_CHARS_RE.search(lower):
+        return False
+    words = _WORD_RE.findall(lower)
+    pt_hits = sum(w in _PT_STOPWORDS for w in words)
+    en_hits = sum(w in _EN_STOPWORDS for w in words)
+    if en_hits > pt_hits:
+        return True
+    tokens = _TOKEN_RE.findall(texto)
+    return 0 < len(tokens) <= 2 and all(
+        (t.isupper() and len(t) >= 2) or t.lower() in _EN_TERMS for t in tokens
+    )
+
+
+def _translation_cache_path(texto: str) -> str:
+    key = hashlib.sha1(f"{LLM_MODEL_TRADUCAO}|{texto}".encode("utf-8")).hexdigest()
+    return os.path.join(TRANSLATION_CACHE_DIR, key[:2], key + ".txt")
+
+
+def _ler_traducao_do_disco(texto: str) -> str | None:
+    path = _translation_cache_path(texto)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _gravar_traducao_no_disco(texto: str, traducao: str) -> None:
+    path = _translation_cache_path(texto)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(traducao)
+
+
+def _mensagens_traducao(texto: str) -> List[Dict[str, str]]:
+    prompt = f"""
 Traduza o texto a seguir para INGLÊS, mantendo a terminologia técnica de Inteligência Artificial correta.
 Não explique nada, responda SOMENTE com a tradução em inglês.
 
 Texto:
 \"\"\"{texto}\"\"\"
 """
-        resp = ollama.chat(
-            model=LLM_MODEL_TRADUCAO,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "Você é um tradutor técnico PT->EN especializado em Inteligência Artificial."
-                },
-                {"role": "user", "content": prompt.strip()},
-            ],
-        )
-        traducao = resp["message"]["content"].strip()
-        if not traducao:
-            return texto
+    return [
+        {
+            "role": "system",
+            "content": "Você é um tradutor técnico PT->EN especializado em Inteligência Artificial."
+        },
+        {"role": "user", "content": prompt.strip()},
+    ]
+
+
+# LRU em memória das traduções, compartilhado pelo caminho síncrono e pelo assíncrono
+# (um lru_cache não deixa consultar sem chamar a função)
+_TRADUCOES_MEM: "OrderedDict[str, str]" = OrderedDict()
+_TRADUCOES_MEM_MAX = 512
+_TRADUCOES_MEM_LOCK = threading.Lock()
+
+
+def _traducao_da_memoria(texto: str) -> str | None:
+    with _TRADUCOES_MEM_LOCK:
+        traducao = _TRADUCOES_MEM.get(texto)
+        if traducao is not None:
+            _TRADUCOES_MEM.move_to_end(texto)
         return traducao
+
+
+def _guardar_traducao_na_memoria(texto: str, traducao: str) -> None:
+    with _TRADUCOES_MEM_LOCK:
+        _TRADUCOES_MEM[texto] = traducao
+        _TRADUCOES_MEM.move_to_end(texto)
+        while len(_TRADUCOES_MEM) > _TRADUCOES_MEM_MAX:
+            _TRADUCOES_MEM.popitem(last=False)
+
+
+def _traduzir_cached(texto: str) -> str:
+    """
+    Tradução com cache em memória (LRU) e em disco.
+    Erros são propagados (e portanto não ficam em cache).
+    """
+    cached = _traducao_da_memoria(texto)
+    if cached is not None:
+        return cached
+
+    cached = _ler_traducao_do_disco(texto)
+    if cached is not None:
+        _guardar_traducao_na_memoria(texto, cached)
+        return cached
+
+    resp = ollama.chat(model=LLM_MODEL_TRADUCAO, messages=_mensagens_traducao(texto))
+    traducao = resp["message"]["content"].strip()
+    if not traducao:
+        return texto
+
+    _gravar_traducao_no_disco(texto, traducao)
+    _guardar_traducao_na_memoria(texto, traducao)
+    return traducao
+
+
+def traduzir_para_ingles(texto: str) -> str:
+    """
+    Traduz um texto (potencialmente em português) para inglês,
+    mantendo termos técnicos de IA o mais fiéis possível.
+
+    Se o texto já parece estar em inglês, devolve sem chamar o LLM.
+    Traduções já feitas (nesta execução ou em anteriores) são reaproveitadas do cache.
+    Se der algum erro, devolve o texto original.
+    """
+    if _parece_ingles(texto):
+        return texto
+
+    try:
+        return _traduzir_cached(texto)
     except Exception as e:
-        print(f"[traduzir_para_ingles] ERRO ao traduzir, usando texto original. Detalhe: {e}")
+        log.warning("[traduzir_para_ingles] ERRO ao traduzir, usando texto original. Detalhe: %s", e)
         return texto
 
 
+async def _traduzir_para_ingles_async(client: ollama.AsyncClient, texto: str) -> str:
+    """
+    Versão assíncrona de traduzir_para_ingles (mesma heurística de idioma e mesmos caches
+    em memória e em disco), para várias traduções poderem ficar em voo ao mesmo tempo.
+    O acesso ao disco roda em threads, fora do event loop.
+    """
+    if _parece_ingles(texto):
+        return texto
+
+    cached = _traducao_da_memoria(texto)
+    if cached is not None:
+        return cached
+
+    cached = await asyncio.to_thread(_ler_traducao_do_disco, texto)
+    if cached is not None:
+        _guardar_traducao_na_memoria(texto, cached)
+        return cached
+
+    try:
+        resp = await client.chat(model=LLM_MODEL_TRADUCAO, messages=_mensagens_traducao(texto))
+    except Exception as e:
+        log.warning("[traduzir_para_ingles] ERRO ao traduzir, usando texto original. Detalhe: %s", e)
+        return texto
+
+    traducao = resp["message"]["content"].strip()
+    if not traducao:
+        return texto
+
+    await asyncio.to_thread(_gravar_traducao_no_disco, texto, traducao)
+    _guardar_traducao_na_memoria(texto, traducao)
+    return traducao
+
+
+# Estado do cache de queries, amarrado ao índice FAISS (id) para o qual foi montado
+_QUERY_CACHE: Dict[str, Any] = {"index_id": None, "cache_index": None, "entries": []}
+
+
+def _query_cache_reset(index_id: int | None) -> None:
+    _QUERY_CACHE["index_id"] = index_id
+    _QUERY_CACHE["cache_index"] = None
+    _QUERY_CACHE["entries"] = []
+
+
+def _query_cache_lookup(
+    index: faiss.Index,
+    query_emb: np.ndarray,
+    top_k: int,
+) -> List[Dict[str, Any]] | None:
+    # Índice recarregado (ou outro índice): os resultados guardados não valem mais
+    if _QUERY_CACHE["index_id"] != id(index):
+        _query_cache_reset(id(index))
+        return None
+
+    cache_index = _QUERY_CACHE["cache_index"]
+    if cache_index is None or cache_index.ntotal == 0:
+        return None
+
+    sims, idxs = cache_index.search(query_emb, 1)
+    sim, pos = float(sims[0][0]), int(idxs[0][0])
+    if pos < 0 or sim < QUERY_CACHE_SIM_THRESHOLD:
+        return None
+
+    entry = _QUERY_CACHE["entries"][pos]
+    if entry["top_k"] != top_k:
+        return None
+
+    entry["last_used"] = time.monotonic()
+    log.info("[rag_retrieve] Resultado reaproveitado do cache de queries (similaridade=%.3f).", sim)
+    return [dict(item) for item in entry["results"]]
+
+
+def _query_cache_store(
+    query_emb: np.ndarray,
+    top_k: int,
+    results: List[Dict[str, Any]],
+) -> None:
+    entries = _QUERY_CACHE["entries"]
+    entries.append({
+        "emb": query_emb[0].copy(),
+        "top_k": top_k,
+        "results": [dict(item) for item in results],
+        "last_used": time.monotonic(),
+    })
+
+    if len(entries) > QUERY_CACHE_MAX_ENTRIES:
+        # LRU: descarta as entradas menos usadas e remonta o índice (pequeno) do cache
+        entries.sort(key=lambda e: e["last_used"])
+        del entries[:len(entries) - QUERY_CACHE_MAX_ENTRIES]
+        cache_index = faiss.IndexFlatIP(query_emb.shape[1])
+        cache_index.add(np.stack([e["emb"] for e in entries]))
+        _QUERY_CACHE["cache_index"] = cache_index
+        return
+
+    if _QUERY_CACHE["cache_index"] is None:
+        _QUERY_CACHE["cache_index"] = faiss.IndexFlatIP(query_emb.shape[1])
+    _QUERY_CACHE["cache_index"].add(query_emb)
+
+
 def rag_retrieve(
     query: str,
-    index: faiss.IndexFlatL2,
-    chunks: List[str],
-    metadata: List[Dict[str, Any]],
+    index: faiss.Index,
+    chunks: pa.ChunkedArray,
+    doc_names: np.ndarray,
+    chunk_ids: np.ndarray,
     top_k: int = TOP_K_DEFAULT,
 ) -> List[Dict[str, Any]]:
     """
@@ -72,46 +553,148 @@ def rag_retrieve(
 
     - Traduz a query para inglês (para combinar melhor com documentos em inglês)
     - Gera embedding da query traduzida
+    - Reaproveita o resultado de uma query anterior quase idêntica (cache semântico)
     - Busca no FAISS
+    - Descarta trechos quase repetidos (Jaccard de 5-gramas acima de DEDUP_JACCARD_THRESHOLD)
     - Retorna uma lista de dicts com:
       {
         "text": <texto do chunk>,
         "doc_name": <nome do PDF>,
         "chunk_id": <índice do chunk dentro do doc>,
         "rank": <posição no ranking>,
-        "distance": <distância L2 no índice>
+        "similarity": <similaridade de cosseno (produto interno) no índice>
       }
+
+    chunks é a coluna Arrow "text"; doc_names e chunk_ids são arrays NumPy alinhados com ela
+    (ver main.load_index_and_data). Só os textos dos resultados são convertidos para str.
+
+    Funciona com qualquer faiss.Index (HNSW, IVF, flat...): a API de .search() é a mesma.
+    Em índices HNSW, o efSearch é ajustado antes da busca.
     """
-    print(f"[rag_retrieve] Query original: {query!r}")
+    log.info("[rag_retrieve] Query original: %r", query)
     query_en = traduzir_para_ingles(query)
-    print(f"[rag_retrieve] Query usada para busca (EN): {query_en!r}")
-
-    # 1) Embedding da query traduzida
-    query_emb = embed_texts([query_en])  # (1, dim)
-    distances, indices = index.search(query_emb, top_k)
-
-    results: List[Dict[str, Any]] = []
-    idxs = indices[0]
-    dists = distances[0]
-
-    for rank, idx in enumerate(idxs):
-        if 0 <= idx < len(chunks):
-            meta = metadata[idx] if idx < len(metadata) else {}
-            item: Dict[str, Any] = {
-                "text": chunks[idx],
-                "doc_name": meta.get("doc_name"),
-                "chunk_id": meta.get("chunk_id"),
-                "rank": rank,
-                "distance": float(dists[rank]),
-            }
-            results.append(item)
-
-    # Log simples pra ver de onde vieram os resultados
-    print("[rag_retrieve] Resultados (doc_name, chunk_id, rank):")
-    for item in results:
-        print(
-            f"  - Rank {item['rank']}: doc={item['doc_name']} | "
-            f"chunk={item['chunk_id']} | dist={item['distance']:.4f}"
-        )
+    log.info("[rag_retrieve] Query usada para busca (EN): %r", query_en)
+
+    # 1) Embedding da query traduzida (já normalizado, no buffer reaproveitado)
+    query_emb = _embed_single(query_en)  # (1, dim)
+
+    # 2) Cache semântico: uma query quase idêntica já buscada dispensa a busca no FAISS
+    cached = _query_cache_lookup(index, query_emb, top_k)
+    if cached is not None:
+        return cached
+
+    # 3) Busca no FAISS
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = max(HNSW_EF_SEARCH, top_k)
+    sims, indices = index.search(query_emb, top_k)
+
+    results = _montar_resultados(indices[0], sims[0], chunks, doc_names, chunk_ids)
+
+    # Log simples pra ver de onde vieram os resultados (só monta as linhas se for exibir)
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("[rag_retrieve] Resultados (doc_name, chunk_id, rank):")
+        for item in results:
+            log.debug(
+                "  - Rank %d: doc=%s | chunk=%s | sim=%.4f",
+                item["rank"], item["doc_name"], item["chunk_id"], item["similarity"],
+            )
+
+    _query_cache_store(query_emb, top_k, results)
 
     return results
+
+
+def _montar_resultados(
+    idxs: np.ndarray,
+    scores: np.ndarray,
+    chunks: pa.ChunkedArray,
+    doc_names: np.ndarray,
+    chunk_ids: np.ndarray,
+) -> List[Dict[str, Any]]:
+    # Filtra de uma vez os ids inválidos (-1 quando o FAISS acha menos de top_k vizinhos);
+    # o rank continua sendo a posição original no resultado do FAISS
+    mask = (idxs >= 0) & (idxs < min(len(chunks), len(doc_names), len(chunk_ids)))
+    ranks = np.flatnonzero(mask)
+
+    results = [
+        {
+            "text": chunks[i].as_py(),
+            "doc_name": doc_names[i],
+            "chunk_id": int(chunk_ids[i]),
+            "rank": r,
+            "similarity": sim,
+        }
+        for r, i, sim in zip(ranks.tolist(), idxs[mask].tolist(), scores[mask].tolist())
+    ]
+    return _deduplicar_resultados(results)
+
+
+def _shingles(texto: str, n: int = DEDUP_SHINGLE_SIZE) -> set:
+    words = texto.lower().split()
+    if len(words) <= n:
+        return {tuple(words)}
+    return {tuple(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+
+def _deduplicar_resultados(
+    results: List[Dict[str, Any]],
+    threshold: float = DEDUP_JACCARD_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """
+    Remove trechos quase repetidos (ex.: o mesmo PDF indexado duas vezes, ou páginas
+    repetidas), para os agentes não gastarem tokens com o mesmo texto. Guloso na ordem
+    do ranking: um item só entra se o Jaccard com todos os já mantidos for <= threshold.
+    O "rank" de cada item continua sendo a posição original no FAISS.
+    """
+    kept: List[Dict[str, Any]] = []
+    kept_shingles: List[set] = []
+    for item in results:
+        sh = _shingles(item["text"])
+        if any(len(sh & other) / len(sh | other) > threshold for other in kept_shingles):
+            continue
+        kept.append(item)
+        kept_shingles.append(sh)
+    return kept
+
+
+async def rag_retrieve_batch(
+    queries: List[str],
+    index: faiss.Index,
+    chunks: pa.ChunkedArray,
+    doc_names: np.ndarray,
+    chunk_ids: np.ndarray,
+    top_k: int = TOP_K_DEFAULT,
+) -> List[List[Dict[str, Any]]]:
+    """
+    rag_retrieve para várias queries de uma vez:
+
+    - Todas as traduções são disparadas juntas (asyncio.gather)
+    - Um único embed_texts para todas as queries traduzidas
+    - Um único index.search com a matriz (N, dim)
+
+    Retorna uma lista de resultados por query (mesmo formato de rag_retrieve).
+    O cache semântico de queries não é consultado aqui: a busca em lote já é uma só.
+    """
+    if not queries:
+        return []
+
+    # Um cliente por chamada (fica preso ao event loop em que foi criado), fechado no fim
+    # para não vazar o pool de conexões do httpx
+    async with ollama.AsyncClient() as client:
+        queries_en = await asyncio.gather(*[_traduzir_para_ingles_async(client, q) for q in queries])
+    for query, query_en in zip(queries, queries_en):
+        log.info("[rag_retrieve_batch] %r -> (EN) %r", query, query_en)
+
+    # embed_texts é síncrono: roda numa thread para não travar o event loop
+    query_embs = await asyncio.to_thread(
+        embed_texts, list(queries_en), cache_dir=QUERY_EMBED_CACHE_DIR
+    )  # (N, dim)
+
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = max(HNSW_EF_SEARCH, top_k)
+    sims, indices = index.search(query_embs, top_k)
+
+    return [
+        _montar_resultados(indices[q], sims[q], chunks, doc_names, chunk_ids)
+        for q in range(len(queries))
+    ]
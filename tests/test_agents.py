@@ -0,0 +1,38 @@
+import numpy as np
+
+import agents
+
+
+def _embed_fixo(dim):
+    def embed(texts, **kwargs):
+        emb = np.zeros((len(texts), dim), dtype=np.float32)
+        emb[:, 0] = 1.0
+        return emb
+    return embed
+
+
+def test_cache_de_respostas_sobrevive_a_troca_de_dimensao(tmp_path, monkeypatch):
+    monkeypatch.setattr(agents, "AGENT_CACHE_DIR", str(tmp_path))
+    namespace = "agente_prepara_aula__teste"
+
+    # Cache gravado com embeddings de 768 dimensões (ex.: nomic-embed-text)
+    monkeypatch.setattr(agents, "embed_texts", _embed_fixo(768))
+    resposta, emb = agents.buscar_resposta_em_cache(namespace, "tema||doc.pdf")
+    assert resposta is None
+    agents.guardar_resposta_em_cache(namespace, "tema||doc.pdf", emb, "plano 768", ["doc.pdf"])
+    assert agents.buscar_resposta_em_cache(namespace, "tema||doc.pdf")[0] == "plano 768"
+
+    # Mesmo diretório lido depois de trocar para um modelo de 384 dimensões (ex.: bge-small)
+    monkeypatch.setattr(agents, "embed_texts", _embed_fixo(384))
+    resposta, emb = agents.buscar_resposta_em_cache(namespace, "tema||doc.pdf")
+    assert resposta is None
+    assert emb.shape == (1, 384)
+
+    agents.guardar_resposta_em_cache(namespace, "tema||doc.pdf", emb, "plano 384", ["doc.pdf"])
+    assert agents.buscar_resposta_em_cache(namespace, "tema||doc.pdf")[0] == "plano 384"
+
+
+def test_namespace_depende_do_modelo_de_embedding(monkeypatch):
+    ns = agents._cache_namespace("agente_tarefas_casa", "gemma3:4b")
+    monkeypatch.setattr(agents, "EMBED_MODEL", "outro-modelo")
+    assert agents._cache_namespace("agente_tarefas_casa", "gemma3:4b") != ns
@@ -0,0 +1,70 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+import rag_core
+from rag_core import _parece_ingles
+
+
+@pytest.mark.parametrize("query", [
+    "Aula de 2h sobre mecanismos de atenção em IA para graduação",
+    "Arquitetura RAG aplicada à educação, nível graduação",
+    "Arquitetura RAG aplicada a educacao, nivel graduacao",
+    "redes neurais recorrentes",
+    "aprendizado profundo",
+    "aula sobre transformers",
+    "inteligencia artificial",
+    "modelos generativos",
+    "visao computacional",
+    "agentes autonomos",
+    "atencao",
+    "",
+])
+def test_queries_em_portugues_sao_traduzidas(query):
+    assert not _parece_ingles(query)
+
+
+@pytest.mark.parametrize("query", [
+    "What is retrieval augmented generation?",
+    "attention mechanisms in transformers",
+    "lecture about the transformer architecture",
+    "transformers",
+    "RAG",
+    "self-attention",
+    "deep learning",
+    "LLM agents",
+    "GPT-4",
+])
+def test_queries_em_ingles_pulam_a_traducao(query):
+    assert _parece_ingles(query)
+
+
+def test_limpar_caches_aplica_ttl_e_teto(tmp_path):
+    agora = time.time()
+    for i in range(10):
+        shard = tmp_path / f"{i % 3:02d}"
+        shard.mkdir(exist_ok=True)
+        path = shard / f"{i}.npy"
+        path.touch()
+        os.utime(path, (agora - i * 86400,) * 2)
+
+    removidos = rag_core.limpar_caches_de_consulta((str(tmp_path),), ttl_days=7, max_files=5)
+
+    restantes = sorted(p.name for p in tmp_path.glob("*/*.npy"))
+    assert removidos == 5
+    assert restantes == [f"{i}.npy" for i in range(5)]
+
+
+def test_embed_texts_nao_grava_em_disco_por_padrao(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        rag_core, "_embed_texts_uncached",
+        lambda texts, model, show_progress_bar: np.ones((len(texts), 4), dtype=np.float32),
+    )
+
+    emb = rag_core.embed_texts(["uma query"])
+
+    assert emb.shape == (1, 4)
+    assert not any(tmp_path.iterdir())